@@ -1,14 +1,2 @@
 from .nxutils import *
-
-
-__all__ = ["edge_pos",
-           "edge_pos_to_array",
-           "separate_edges",
-           "edge_sep_to_mid_data",
-           "g_to_edge_array",
-           "g_to_plot_arrays",
-           "g_to_traces",
-           "obj_to_node_and_edges",
-           "diGraph_to_richTree",
-           "filter_factory"
-           ]
+from .nxutils import __all__
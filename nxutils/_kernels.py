@@ -0,0 +1,47 @@
+""" Numba kernels for the numeric hot paths in `nxutils.nxutils`.
+
+Importing this module requires numba. `nxutils.nxutils` imports it
+lazily and uses NumPy instead when numba is not installed.
+"""
+import math
+
+import numba
+
+
+@numba.njit(inline="always", fastmath=True, cache=True)
+def atan2_approx(y, x):
+    """ Return atan2(y, x) to within about 1e-5 radians.
+
+    Reduces to the first octant and evaluates an odd polynomial, so unlike
+    the libm call it has no branches LLVM can't turn into selects and the
+    loop around it vectorizes. Plenty for choosing an arrow angle.
+    """
+    ax = abs(x)
+    ay = abs(y)
+    hi = max(ax, ay)
+    a = min(ax, ay) / hi if hi > 0.0 else 0.0
+    s = a * a
+    r = ((((-0.01172120 * s + 0.05265332) * s - 0.11643287) * s
+          + 0.19354346) * s - 0.33262347) * s + 0.99997726
+    r *= a
+    if ay > ax:
+        r = 0.5 * math.pi - r
+    if x < 0.0:
+        r = math.pi - r
+    if y < 0.0:
+        r = -r
+    return r
+
+
+@numba.njit(parallel=True, fastmath=True, cache=True)
+def mid_kernel(starts, ends, mid_pos, mid_angle):
+    """ Write edge midpoints and directions into `mid_pos` and `mid_angle`.
+
+    `starts` and `ends` are (E, 2) arrays of edge endpoints, typically the
+    [0::3] and [1::3] views of a separated edge array.
+    """
+    for i in numba.prange(starts.shape[0]):
+        mid_pos[i, 0] = 0.5 * (starts[i, 0] + ends[i, 0])
+        mid_pos[i, 1] = 0.5 * (starts[i, 1] + ends[i, 1])
+        mid_angle[i] = atan2_approx(ends[i, 0] - starts[i, 0],
+                                    ends[i, 1] - starts[i, 1]) * 180.0 / math.pi
@@ -1,37 +1,191 @@
+import base64
+import functools
+import inspect
+import os
+import weakref
 import numpy as np
 import networkx as nx
-from dataclasses import asdict
+from dataclasses import asdict, dataclass
 import plotly.graph_objects as go
 from rich.tree import Tree
 
-__all__ = ["edge_pos",
+__all__ = ["PlotArrays",
+           "edge_pos",
            "edge_pos_to_array",
+           "edges_to_endpoint_array",
+           "edges_to_sep_array",
+           "edge_pos_arrays",
            "separate_edges",
            "edge_sep_to_mid_data",
            "g_to_edge_array",
            "g_to_plot_arrays",
            "g_to_traces",
+           "g_to_traces_batch",
+           "figure_from_graph",
            "obj_to_node_and_edges",
+           "obj_list_to_node_and_edges",
+           "objs_to_graph",
            "diGraph_to_richTree",
-           "filter_factory"
+           "filter_factory",
+           "clear_layout_cache",
+           "invalidate_layout"
            ]
 
+# Sentinel for attributes that are not set.
+_MISS = object()
+
+# Importing numba and compiling the midpoint kernel takes around a second
+# per input dtype, against well under a millisecond for the NumPy path on
+# 10k edges, so the kernel is only used when NXUTILS_NUMBA is set, e.g. by
+# long-running apps that redraw very large graphs many times.
+_USE_NUMBA = os.environ.get("NXUTILS_NUMBA", "") not in ("", "0")
+
+# Even once compiled, below this many edges Numba's dispatch and threading
+# cost more than they save over plain NumPy.
+_NUMBA_MIN_EDGES = 10000
+
+# Above this many points in the node or edge trace, SVG rendering in the
+# browser dominates and `g_to_traces` switches to WebGL.
+_GL_THRESHOLD = 5000
+
+# Default kwargs for each trace `g_to_traces` builds. Never modified;
+# `_merge_trace_kwargs` copies them for each call.
+_TRACE_DEFAULTS = {
+    "nodes": {"name": "nodes",
+              "mode": "markers",
+              },
+    "edges": {"name": "edges",
+              "mode": "lines",
+              },
+    "arrows": {"name": "arrows",
+               "mode": "markers",
+               "marker": {"size": 12,
+                          "symbol": "arrow-wide",
+                          "color": "green"},
+               }
+}
+
+# Layout results per graph. Only the most recent result of each kind is
+# kept, along with the (layout_func, number of nodes, number of edges,
+# g.graph["_layout_version"]) key it was computed for.
+_pos_cache = weakref.WeakKeyDictionary()
+
+
+@dataclass(eq=False)
+class PlotArrays:
+    """ Contiguous float32 arrays for plotting a graph, from `g_to_plot_arrays`.
+
+    node_xy: (N, 2) node positions.
+    edge_xy: NaN-separated edge endpoints, as from `separate_edges`.
+    mid_xy, mid_angle: Edge midpoints and directions, or `None` if the
+        graph is undirected.
+
+    Unpacks and indexes like the `(pos, edge_sep, mid_data)` tuple, where
+    `mid_data` is `(mid_xy, mid_angle)` or `None`. Compares by identity,
+    as array fields have no single truth value.
+    """
+    node_xy: np.ndarray
+    edge_xy: np.ndarray
+    mid_xy: np.ndarray | None = None
+    mid_angle: np.ndarray | None = None
+
+    def __iter__(self):
+        if self.mid_xy is None:
+            mid_data = None
+        else:
+            mid_data = (self.mid_xy, self.mid_angle)
+        return iter((self.node_xy, self.edge_xy, mid_data))
+
+    def __getitem__(self, i):
+        return tuple(self)[i]
+
+    def __len__(self):
+        return 3
+
 
 def edge_pos(edges, pos):
-    """ Return edge endpoints analogous to `pos` from nx.layout funcs."""
+    """ Return edge endpoints analogous to `pos` from nx.layout funcs.
+
+    Only for callers that need the per-edge dict. To get arrays, use
+    `edges_to_endpoint_array`, which never builds this dict.
+    """
     edge_pos = [(edge, (pos[edge[0]], pos[edge[1]])) for edge in edges]
     return dict(edge_pos)
 
 
 def edge_pos_to_array(edge_pos):
-    """ Return an np array of edge endpoints."""
-    a = []
-    for edge in edge_pos:
-        start, end = edge_pos[edge]
-        a.append(start)
-        a.append(end)
-        # a.append(np.full(2, np.nan))
-    return np.array(a)
+    """ Return an np array of edge endpoints from an `edge_pos` dict."""
+    if not edge_pos:
+        return np.empty((0, 2))
+    starts, ends = zip(*edge_pos.values())
+    a = np.empty((2 * len(edge_pos), len(starts[0])))
+    a[0::2] = starts
+    a[1::2] = ends
+    return a
+
+
+def _pos_to_array(pos):
+    """ Return a node -> row index dict and an (N, D) array of `pos`."""
+    idx = {n: i for i, n in enumerate(pos)}
+    dim = len(next(iter(pos.values()))) if pos else 2
+    # A (float64, D) subarray dtype reads each position whole, whether it
+    # is a tuple or an ndarray, instead of one coordinate at a time.
+    pos_arr = np.fromiter(pos.values(),
+                          dtype=np.dtype((np.float64, dim)),
+                          count=len(pos))
+    return idx, pos_arr
+
+
+def _edge_index(edges, idx):
+    """ Return an (E, 2) array of row indices into a `_pos_to_array` array."""
+    edges = list(edges)
+    return np.fromiter((idx[v] for e in edges for v in e[:2]),
+                       dtype=np.intp,
+                       count=2 * len(edges)).reshape(-1, 2)
+
+
+def _fill_edge_sep(starts, ends, dtype=np.float64):
+    """ Return a `separate_edges` style array from start and end arrays."""
+    edge_sep = np.empty((max(3 * len(starts) - 1, 0), *starts.shape[1:]),
+                        dtype=dtype)
+    edge_sep[0::3] = starts
+    edge_sep[1::3] = ends
+    edge_sep[2::3] = np.nan
+    return edge_sep
+
+
+def edge_pos_arrays(edges, pos_arr, node_to_idx):
+    """ Return arrays of edge start and end positions.
+
+    pos_arr: An (N, D) array of node positions.
+    node_to_idx: A dict mapping each node to its row in `pos_arr`.
+
+    Returns:
+        A tuple of (E, D) arrays of start and end points, gathered from
+        `pos_arr` with one fancy index each.
+    """
+    edge_idx = _edge_index(edges, node_to_idx)
+    return pos_arr[edge_idx[:, 0]], pos_arr[edge_idx[:, 1]]
+
+
+def edges_to_endpoint_array(edges, pos):
+    """ Return an np array of edge endpoints directly from `edges` and `pos`.
+
+    Equivalent to `edge_pos_to_array(edge_pos(edges, pos))`, but gathers
+    every endpoint with a single fancy index instead of a per-edge loop.
+    """
+    idx, pos_arr = _pos_to_array(pos)
+    return pos_arr[_edge_index(edges, idx)].reshape(-1, pos_arr.shape[1])
+
+
+def edges_to_sep_array(edges, pos):
+    """ Return a `separate_edges` style array directly from `edges` and `pos`.
+
+    Equivalent to `separate_edges(edge_pos_to_array(edge_pos(edges, pos)))`,
+    but allocates only the final NaN-separated array.
+    """
+    idx, pos_arr = _pos_to_array(pos)
+    return _fill_edge_sep(*edge_pos_arrays(edges, pos_arr, idx))
 
 
 def separate_edges(edge_arr):
@@ -39,105 +193,441 @@ def separate_edges(edge_arr):
 
     This makes plotting edges as a single trace in plotly easier.
     """
-    return np.insert(edge_arr, slice(2, -1, 2), np.full(2, np.nan), axis=0)
+    n_edges = edge_arr.shape[0] // 2
+    # NaN needs a floating dtype; integer endpoints are promoted.
+    dtype = edge_arr.dtype if edge_arr.dtype.kind == "f" else np.float64
+    out = np.empty((max(3 * n_edges - 1, 0), *edge_arr.shape[1:]),
+                   dtype=dtype)
+    out[0::3] = edge_arr[0::2]
+    out[1::3] = edge_arr[1::2]
+    out[2::3] = np.nan
+    return out
+
+
+@functools.cache
+def _mid_kernel():
+    """ Return the Numba midpoint kernel, or None if numba is missing."""
+    try:
+        from ._kernels import mid_kernel
+    except ImportError:
+        return None
+    return mid_kernel
 
 
 def edge_sep_to_mid_data(g, edge_sep):
     """ Return positions of edge halfway point and edge direction."""
-    mid_pos = edge_sep[0::3]/2 + edge_sep[1::3]/2
-    mid_vector = edge_sep[1::3] - edge_sep[0::3]
-    mid_angle = np.arctan2(mid_vector[:, 0], mid_vector[:, 1]) * (180 / np.pi)
+    start = edge_sep[0::3]
+    end = edge_sep[1::3]
+    if _USE_NUMBA and start.shape[0] >= _NUMBA_MIN_EDGES:
+        kernel = _mid_kernel()
+        if kernel is not None:
+            mid_pos = np.empty(start.shape, dtype=edge_sep.dtype)
+            mid_angle = np.empty(start.shape[0], dtype=edge_sep.dtype)
+            kernel(start, end, mid_pos, mid_angle)
+            return (mid_pos, mid_angle)
+
+    mid_pos = np.add(start, end)
+    mid_pos *= 0.5
+    mid_vector = np.subtract(end, start)
+    mid_angle = np.arctan2(mid_vector[:, 0], mid_vector[:, 1])
+    np.degrees(mid_angle, out=mid_angle)
     return (mid_pos, mid_angle)
 
 
+def _func_ref(layout_func):
+    """ Return a weak reference to `layout_func` that compares like it.
+
+    Cache keys hold this rather than `layout_func`, which may be a method
+    of the graph or close over it and would keep the graph alive.
+    """
+    if inspect.ismethod(layout_func):
+        return weakref.WeakMethod(layout_func)
+    try:
+        return weakref.ref(layout_func)
+    except TypeError:  # Not weakly referenceable, e.g. a builtin.
+        return layout_func
+
+
+def _layout_key(g, layout_func):
+    """ Return the `_pos_cache` key for `layout_func` applied to `g`."""
+    return (_func_ref(layout_func), g.number_of_nodes(), g.number_of_edges(),
+            g.graph.get("_layout_version"))
+
+
+def _cached(g, slot, key, compute):
+    """ Return `compute()`, reusing the result if `key` matches the last one.
+
+    Each graph keeps one (key, value) pair per `slot`, so calls with a new
+    `layout_func` replace the old result rather than adding to it.
+    """
+    cache = _pos_cache.setdefault(g, {})
+    entry = cache.get(slot)
+    if entry is not None and entry[0] == key:
+        return entry[1]
+    value = compute()
+    cache[slot] = (key, value)
+    return value
+
+
+def _positions(g, layout_func):
+    """ Return `layout_func(g)`, reusing an earlier result for `g`."""
+    return _cached(g, "pos", _layout_key(g, layout_func),
+                   lambda: layout_func(g))
+
+
+def _position_arrays(g, layout_func):
+    """ Return `_pos_to_array` of `_positions(g, layout_func)`, also cached.
+
+    The node order and array are kept next to the layout so repeat calls
+    skip converting the `pos` dict again. Don't write to the array.
+    """
+    key = _layout_key(g, layout_func)
+    arrays = _cached(g, "array", key,
+                     lambda: _pos_to_array(_positions(g, layout_func)))
+    # Nodes can be swapped without changing the counts in the key, so a
+    # cached layout that doesn't cover every node of `g` is a miss.
+    if not all(n in arrays[0] for n in g):
+        invalidate_layout(g)
+        arrays = _cached(g, "array", key,
+                         lambda: _pos_to_array(_positions(g, layout_func)))
+    return arrays
+
+
+def _is_planar(g):
+    """ Return `nx.is_planar(g)`, cached with the layouts of `g`."""
+    key = (g.number_of_nodes(), g.number_of_edges(),
+           g.graph.get("_layout_version"))
+    return _cached(g, "planar", key, lambda: nx.is_planar(g))
+
+
+def clear_layout_cache():
+    """ Forget all layouts cached by `g_to_edge_array` and `g_to_plot_arrays`.
+
+    Each graph keeps only its most recent layout, which is recomputed when
+    `layout_func`, the number of nodes or edges, the set of nodes, or
+    `g.graph["_layout_version"]` changes. Pass the same `layout_func`
+    object, not a new lambda or partial, to reuse it across calls.
+    Call this, or `invalidate_layout` for a single graph, after other
+    changes that should produce a new layout.
+    """
+    _pos_cache.clear()
+
+
+def invalidate_layout(g):
+    """ Forget the cached layouts of `g` only."""
+    _pos_cache.pop(g, None)
+
+
 def g_to_edge_array(g, layout_func=None):
     """ Return an array of edge endpoints from a graph. """
     if layout_func is None:
-        try:
-            layout_func = g.layout_func
-        except AttributeError:
-            layout_func = nx.planar_layout
+        layout_func = getattr(g, "layout_func", None) or nx.planar_layout
+
+    idx, pos_arr = _position_arrays(g, layout_func)
+    return pos_arr[_edge_index(g.edges(), idx)].reshape(-1, pos_arr.shape[1])
+
 
-    return edge_pos_to_array(edge_pos(g.edges(), layout_func(g)))
+def g_to_plot_arrays(g, layout_func=None, include_mid=True):
+    """ Return the node, edge and edge midpoint arrays for plotting `g`.
 
+    layout_func: A function that takes `g` and returns a `pos` dict. If
+        `None`, use `g.layout_func` if set, otherwise `nx.planar_layout`
+        for planar graphs and `nx.spring_layout` for the rest. Layouts are
+        cached per graph (see `clear_layout_cache`).
+    include_mid: If False, skip the edge midpoints and angles even if `g`
+        is directed.
 
-def g_to_plot_arrays(g, layout_func=None):
+    Returns:
+        A `PlotArrays`, which also unpacks as `(pos, edge_sep, mid_data)`.
+    """
     if layout_func is None:
-        try:
-            layout_func = g.layout_func
-        except AttributeError:
-            if nx.is_planar(g):
-                layout_func = nx.planar_layout
-            else:
-                layout_func = nx.spring_layout
-
-    pos = layout_func(g)
-    edge_sep = separate_edges(edge_pos_to_array(edge_pos(g.edges, pos)))
-    if g.is_directed():
-        mid_data = edge_sep_to_mid_data(g, edge_sep)
+        layout_func = getattr(g, "layout_func", None)
+    if layout_func is None:
+        if _is_planar(g):
+            layout_func = nx.planar_layout
+        else:
+            # Switches to its energy minimizer for 500+ nodes.
+            layout_func = nx.spring_layout
+
+    # Build the node array once and fill the separated edge array
+    # straight from it, rather than going through `edge_pos`,
+    # `edge_pos_to_array` and `separate_edges`.
+    # Plot data is float32, which halves the bytes moved and serialized
+    # and is ample precision for screen coordinates.
+    idx, pos_arr = _position_arrays(g, layout_func)
+    edge_sep = _fill_edge_sep(*edge_pos_arrays(g.edges, pos_arr, idx),
+                              dtype=np.float32)
+    if include_mid and g.is_directed():
+        mid_xy, mid_angle = edge_sep_to_mid_data(g, edge_sep)
     else:
-        mid_data = None
-    return (np.array(list(pos.values())),
-            edge_sep,
-            mid_data)
-
-
-def g_to_traces(g, trace_kwargs={}, layout_func=None):
-    trace_defaults = {
-        "nodes": {"name": "nodes",
-                  "mode": "markers",
-                  },
-        "edges": {"name": "edges",
-                  "mode": "lines",
-                  },
-        "arrows": {"name": "arrows",
-                   "mode": "markers",
-                   "marker": {"size": 12,
-                              "symbol": "arrow-wide",
-                              "color": "green"},
-                   }
-    }
+        mid_xy = mid_angle = None
+    # astype copies, so callers can't modify the cached array.
+    return PlotArrays(pos_arr.astype(np.float32), edge_sep, mid_xy, mid_angle)
+
 
+def _downsample(pos, e_pos, grid_n, directed=True):
+    """ Merge nodes into the cells of a `grid_n` by `grid_n` grid.
+
+    Returns the mean position of the nodes in each occupied cell, the
+    number of nodes in each cell, and a separated edge array with one edge
+    per pair of distinct cells joined by at least one edge.
+    """
+    lo = pos.min(axis=0)
+    span = np.ptp(pos, axis=0)
+    span[span == 0] = 1.0
+
+    def cell(xy):
+        ix = np.floor((xy - lo) / span * grid_n).astype(np.int64)
+        np.clip(ix, 0, grid_n - 1, out=ix)
+        return ix[:, 0] * grid_n + ix[:, 1]
+
+    keys, inv, counts = np.unique(cell(pos), return_inverse=True,
+                                  return_counts=True)
+    cell_xy = np.zeros((len(keys), 2))
+    np.add.at(cell_xy, inv, pos)
+    cell_xy /= counts[:, np.newaxis]
+
+    # Edge endpoints are node positions, so they land in occupied cells.
+    cell_edges = np.stack([np.searchsorted(keys, cell(e_pos[0::3])),
+                           np.searchsorted(keys, cell(e_pos[1::3]))], axis=1)
+    cell_edges = cell_edges[cell_edges[:, 0] != cell_edges[:, 1]]
+    if not directed:
+        cell_edges.sort(axis=1)
+    cell_edges = np.unique(cell_edges, axis=0)
+    return cell_xy, counts, _fill_edge_sep(cell_xy[cell_edges[:, 0]],
+                                           cell_xy[cell_edges[:, 1]])
+
+
+def _trace(cls, as_dict, **kwargs):
+    """ Return a `cls` trace, or the equivalent plain dict if `as_dict`."""
+    if as_dict:
+        return dict(type=cls.__name__.lower(), **kwargs)
+    return cls(**kwargs)
+
+
+def _merge_trace_kwargs(trace_kwargs, directed):
+    """ Return `trace_kwargs` layered over `_TRACE_DEFAULTS`."""
     # If arrows is explicitly set, let user know that doesn't
     # make sense.
-    if "arrows" in trace_kwargs and not g.is_directed():
+    if trace_kwargs.get("arrows") is not None and not directed:
         raise TypeError("Cannot plot directed arrows if g is undirected. "
                         "Remove `arrows` from trace_kwargs.")
 
-    # This is a little weird, but it doesn't overwrite parameter
-    # kwargs with defaults, and keeps the "trace_kwargs".
-    kw = trace_defaults
-    if not g.is_directed():
-        del kw["arrows"]
-    kw.update(trace_kwargs)
-    trace_kwargs = kw
-
-    # g_to_plot_arrays will handle layout_func if None.
-    pos, e_pos, mid_data = g_to_plot_arrays(g, layout_func=layout_func)
+    # Copy the defaults, then layer each trace's kwargs over them, so a
+    # partial dict such as {"nodes": {"text": ...}} keeps the default
+    # name/mode and parameter kwargs are never overwritten by defaults.
+    kw = {name: dict(defaults) for name, defaults in _TRACE_DEFAULTS.items()
+          if name != "arrows" or directed}
+    for name, kwargs in trace_kwargs.items():
+        if kwargs is None:  # Leave this trace out.
+            kw.pop(name, None)
+            continue
+        defaults = kw.get(name, {})
+        merged = {**defaults, **kwargs}
+        # Nested dicts such as `marker` are layered too, so
+        # {"arrows": {"marker": {"color": ...}}} keeps the arrow symbol.
+        for key, value in kwargs.items():
+            if isinstance(value, dict) and isinstance(defaults.get(key), dict):
+                merged[key] = {**defaults[key], **value}
+        kw[name] = merged
+    return kw
+
+
+def _typed(a):
+    """ Return `a` as a plotly typed-array spec of base64 float32 data."""
+    a = np.ascontiguousarray(a, dtype=np.float32)
+    return {"dtype": "f4",
+            "bdata": base64.b64encode(a.tobytes()).decode("ascii")}
+
+
+def _build_traces(pos, e_pos, mid_data, trace_kwargs, use_gl, return_dicts,
+                  counts=None):
+    """ Return the traces dict for `g_to_traces` from its plot arrays."""
+    if use_gl is None:
+        use_gl = max(pos.shape[0], e_pos.shape[0]) > _GL_THRESHOLD
+    ScatterClass = go.Scattergl if use_gl else go.Scatter
+    # Plain dicts skip plotly's own conversion, so encode them here as
+    # typed arrays, which plotly.js reads as binary. Trace objects get
+    # contiguous columns, which plotly encodes as binary without another
+    # copy.
+    if return_dicts:
+        column = _typed
+    else:
+        column = np.ascontiguousarray
 
     traces = {}
     if "nodes" in trace_kwargs:
-        traces["nodes"] = go.Scatter(
-            x=pos[:, 0], y=pos[:, 1],
-            **trace_kwargs["nodes"])
+        node_kwargs = trace_kwargs["nodes"]
+        if counts is not None:
+            marker = dict(node_kwargs.get("marker", {}))
+            marker.setdefault("size", 4 + 16 * np.sqrt(counts / counts.max()))
+            node_kwargs = dict(node_kwargs, marker=marker)
+        traces["nodes"] = _trace(
+            ScatterClass, return_dicts,
+            x=column(pos[:, 0]), y=column(pos[:, 1]),
+            **node_kwargs)
 
     if "edges" in trace_kwargs:
-        traces["edges"] = go.Scatter(
-            x=e_pos[:, 0], y=e_pos[:, 1],
+        traces["edges"] = _trace(
+            ScatterClass, return_dicts,
+            x=column(e_pos[:, 0]), y=column(e_pos[:, 1]),
             **trace_kwargs["edges"])
 
     if "arrows" in trace_kwargs:
         mid_pos, mid_angle = mid_data
-        if "angle" not in trace_kwargs["arrows"]["marker"]:
-            trace_kwargs["arrows"]["marker"].update({"angle": mid_angle})
-        traces["arrows"] = go.Scattergl(
-            x=mid_pos[:, 0], y=mid_pos[:, 1],
-            **trace_kwargs["arrows"],
+        arrow_kwargs = trace_kwargs["arrows"]
+        marker = arrow_kwargs.get("marker", {})
+        if "angle" not in marker:
+            # Copy rather than update, the marker may be the caller's dict.
+            arrow_kwargs = dict(arrow_kwargs,
+                                marker=dict(marker, angle=mid_angle))
+        traces["arrows"] = _trace(
+            go.Scattergl, return_dicts,
+            x=column(mid_pos[:, 0]), y=column(mid_pos[:, 1]),
+            **arrow_kwargs,
         )
 
     return traces
 
 
+def g_to_traces(g, trace_kwargs={}, layout_func=None, use_gl=None,
+                max_points=None, grid_n=100, return_dicts=False):
+    """ Return a dict of plotly traces for the nodes, edges and arrows of `g`.
+
+    All edges go into a single trace, separated by NaN rows (see
+    `separate_edges`), so large graphs stay one trace instead of one per
+    edge. That is also what lets them be drawn with WebGL.
+
+    use_gl: If True, draw nodes and edges with `go.Scattergl` instead of
+        `go.Scatter`. If `None`, use WebGL once either trace has more than
+        5000 points.
+    max_points: If `g` has more nodes than this, bin nodes into a `grid_n`
+        by `grid_n` grid and plot one marker per occupied cell, sized by
+        its node count, with one edge per pair of connected cells. If
+        `None`, always plot every node. Binned traces use WebGL unless
+        `use_gl` is False. Per-node values in `trace_kwargs`, such as
+        `text` or `marker.color` arrays, are passed through as given and
+        no longer line up with the binned markers.
+    return_dicts: If True, return plain trace dicts with `type` set instead
+        of `go.Scatter` objects, so plotly validates them only once, when
+        they are added to a figure (see `figure_from_graph`).
+
+    Set a trace's entry in `trace_kwargs` to `None` to leave it out. Without
+    an arrows trace, edge midpoints and angles are not computed.
+    """
+    trace_kwargs = _merge_trace_kwargs(trace_kwargs, g.is_directed())
+
+    # g_to_plot_arrays will handle layout_func if None.
+    pos, e_pos, mid_data = g_to_plot_arrays(
+        g, layout_func=layout_func, include_mid="arrows" in trace_kwargs)
+
+    counts = None
+    if max_points is not None and pos.shape[0] > max_points:
+        pos, counts, e_pos = _downsample(pos, e_pos, grid_n,
+                                         directed=g.is_directed())
+        if mid_data is not None:
+            mid_data = edge_sep_to_mid_data(g, e_pos)
+        if use_gl is None:
+            use_gl = True
+
+    return _build_traces(pos, e_pos, mid_data, trace_kwargs, use_gl,
+                         return_dicts, counts=counts)
+
+
+def g_to_traces_batch(graphs, trace_kwargs={}, layout_func=None, use_gl=None,
+                      return_dicts=False):
+    """ Return one set of traces covering every graph in `graphs`.
+
+    Like `g_to_traces`, but the nodes, edges and arrows of all the graphs
+    are concatenated, NaN-separated, into one trace of each kind rather
+    than three traces per graph. Plotly's cost grows with the number of
+    traces far faster than with the number of points per trace. Each
+    graph keeps the coordinates its own layout gives it.
+
+    use_gl: As for `g_to_traces`, judged on the combined traces.
+    """
+    graphs = list(graphs)
+    directed = any(g.is_directed() for g in graphs)
+    trace_kwargs = _merge_trace_kwargs(trace_kwargs, directed)
+
+    gap = np.full((1, 2), np.nan, dtype=np.float32)
+    node_parts, edge_parts = [], []
+    mid_pos_parts, mid_angle_parts = [], []
+    for g in graphs:
+        pos, e_pos, mid_data = g_to_plot_arrays(
+            g, layout_func=layout_func, include_mid="arrows" in trace_kwargs)
+        node_parts += [pos, gap]
+        edge_parts += [e_pos, gap]
+        if mid_data is not None:
+            mid_pos_parts.append(mid_data[0])
+            mid_angle_parts.append(mid_data[1])
+
+    # Drop the trailing separators.
+    empty = np.empty((0, 2), dtype=np.float32)
+    pos = np.concatenate(node_parts[:-1] or [empty])
+    e_pos = np.concatenate(edge_parts[:-1] or [empty])
+    if mid_pos_parts:
+        mid_data = (np.concatenate(mid_pos_parts),
+                    np.concatenate(mid_angle_parts))
+    else:
+        mid_data = None
+    return _build_traces(pos, e_pos, mid_data, trace_kwargs, use_gl,
+                         return_dicts)
+
+
+def figure_from_graph(g, **kwargs):
+    """ Return a `go.Figure` of `g` with all its traces added in one batch.
+
+    kwargs are passed to `g_to_traces`.
+    """
+    fig = go.Figure()
+    with fig.batch_update():
+        fig.add_traces(list(g_to_traces(g, return_dicts=True,
+                                        **kwargs).values()))
+    return fig
+
+
+def _edge_attr_items(edge_attr):
+    """ Return `edge_attr` as a tuple of (edge data name, obj attr) pairs.
+
+    A dict maps names to attributes, a list uses each attribute as its own
+    name, and `None` or `False` give no pairs.
+    """
+    if edge_attr is None or edge_attr is False:
+        return ()
+    # Allow list or dict.
+    if isinstance(edge_attr, dict):
+        return tuple(edge_attr.items())
+    return tuple(zip(edge_attr, edge_attr))
+
+
+def _obj_edges(obj, node, parent_attrs, eattr_items, edge_attr_func):
+    """ Return the edges from `node` to each parent set on `obj`.
+
+    eattr_items: Pairs from `_edge_attr_items`.
+    edge_attr_func: As for `obj_to_node_and_edges`, or `None`.
+    """
+    # Each `parent_attr` may add an edge.
+    edgebunch = []
+    for parent_attr in parent_attrs:
+        parent = getattr(obj, parent_attr, _MISS)
+        # Skip if attribute doesn't exist. Skip: [u][None] isn't an edge.
+        if parent is _MISS or parent is None:
+            continue
+
+        data = {}
+        for eattr_name, eattr in eattr_items:
+            eattr = getattr(obj, eattr)
+            # Don't set None, but don't raise error.
+            if eattr is not None:
+                data[eattr_name] = eattr
+        if edge_attr_func is not None:
+            # edge_attr_func must return a dict.
+            data.update(edge_attr_func(obj))
+        edgebunch.append((node, parent, data) if data else (node, parent))
+    return edgebunch
+
+
 def obj_to_node_and_edges(obj, node_attr,
                           parent_attr_list=["parent_id",
                                             "project_id",
@@ -169,55 +659,74 @@ def obj_to_node_and_edges(obj, node_attr,
         node = obj
     else:
         node = getattr(obj, node_attr)
-    # Each `parent_attr` may add an edge.
-    edgebunch = []
-    for parent_attr in parent_attr_list:
-        try:
-            parent = getattr(obj, parent_attr)
-        except AttributeError:
-            continue  # Skip if attribute doesn't exist.
-
-        if parent is not None:  # Skip: [u][None] isn't an edge.
-            edge = (node, parent)
-            if edge_attr is not False:  # Add no edge data if edge_attr False.
-                if edge_attr is not None:
-                    # Allow list or dict.
-                    try:
-                        eattr_items = edge_attr.items()
-                    except AttributeError:
-                        eattr_items = zip(edge_attr, edge_attr)
-                    for eattr_name, eattr in eattr_items:
-                        eattr = getattr(obj, eattr)
-                        # Don't set None, but don't raise error.
-                        if eattr is not None:
-                            edge = (*edge, {eattr_name: getattr(obj, eattr)})
-
-                if edge_attr_func is not None:
-                    try:
-                        u, v, data = edge
-                    except ValueError:
-                        u, v = edge
-                    # edge_attr_func must return a dict.
-                    try:
-                        data.update(edge_attr_func(obj))
-                    except (NameError, UnboundLocalError):
-                        data = edge_attr_func(obj)
-
-                    edge = (u, v, data)
-        try:
-            edgebunch.append(edge)
-        except NameError:
-            pass
-
+    eattr_items = _edge_attr_items(edge_attr)
+    if edge_attr is False:  # Add no edge data if edge_attr False.
+        edge_attr_func = None
+    edgebunch = _obj_edges(obj, node, parent_attr_list, eattr_items,
+                           edge_attr_func)
     return (node, dict(obj=obj)), edgebunch
 
 
+def obj_list_to_node_and_edges(objs, node_attr,
+                               parent_attr_list=["parent_id",
+                                                 "project_id",
+                                                 "section_id"],
+                               edge_attr=None,
+                               edge_attr_func=None):
+    """ Return nodes and edges for many objects, ready for bulk insertion.
+
+    Batch form of `obj_to_node_and_edges`. Arguments are the same, except
+    `objs` is an iterable of objects.
+
+    Returns:
+        A list of (node, data) tuples for `add_nodes_from` and a list of
+        edges for `add_edges_from`.
+    """
+    # Resolve everything that doesn't depend on the object once.
+    eattr_items = _edge_attr_items(edge_attr)
+    if edge_attr is False:
+        edge_attr_func = None
+    parent_attrs = tuple(parent_attr_list)
+
+    nodes = []
+    edges = []
+    for obj in objs:
+        node = obj if node_attr is None else getattr(obj, node_attr)
+        nodes.append((node, dict(obj=obj)))
+        edges.extend(_obj_edges(obj, node, parent_attrs, eattr_items,
+                                edge_attr_func))
+
+    return nodes, edges
+
+
+def objs_to_graph(objs, node_attr,
+                  parent_attr_list=["parent_id",
+                                    "project_id",
+                                    "section_id"],
+                  edge_attr=None,
+                  edge_attr_func=None,
+                  g=None):
+    """ Return a graph of `objs` built with one bulk insert of each kind.
+
+    Arguments are as for `obj_list_to_node_and_edges`. If `g` is given, the
+    nodes and edges are added to it, otherwise to a new `nx.DiGraph`.
+    """
+    nodes, edges = obj_list_to_node_and_edges(objs, node_attr,
+                                              parent_attr_list,
+                                              edge_attr, edge_attr_func)
+    if g is None:
+        g = nx.DiGraph()
+    g.add_nodes_from(nodes)
+    g.add_edges_from(edges)
+    return g
+
+
 def diGraph_to_richTree(g, n=None, label_func=None, root_label=None):
     """ Take a digraph with parents pointing to children and return a Tree.
 
     This was really hard to figure out.
-    Recursively walk a graph and return a Rich.Tree
-    of the hierarchy.
+    Walk a graph depth first with an explicit stack and return a
+    Rich.Tree of the hierarchy.
 
     g: The graph to walk.
     n: The first node in the walk. If `None` self to the first node
@@ -239,36 +748,60 @@ def diGraph_to_richTree(g, n=None, label_func=None, root_label=None):
         except AttributeError:
             root_label = "Root"
 
+    succ = g.succ
     # Top level might be a forest.
     if n is None:
-        nbrs = [node for node in g if len(g.pred[node]) == 0]
+        nbrs = [node for node, deg in g.in_degree() if deg == 0]
         tree = Tree(root_label)
+        on_path = set()
     else:
-        nbrs = g.adj[n]
+        nbrs = succ[n]
         tree = Tree(label_func(g, n))
-
-    for nb in nbrs:
-        if len(g.adj[nb]) > 0:
-            tree.add(diGraph_to_richTree(g, nb, label_func))
-        else:
-            tree.add(label_func(g, nb))
+        on_path = {n}
+
+    # Shared descendants are visited once per parent; label each node once.
+    labels = {}
+    # Each entry is a subtree, the node it stands for, and the nodes to
+    # hang under it. An entry with no subtree marks leaving that node, so
+    # `on_path` always holds the nodes from the top down to the current one.
+    stack = []
+
+    def add_children(parent, nbrs):
+        for nb in nbrs:
+            if nb not in labels:
+                labels[nb] = label_func(g, nb)
+            subtree = parent.add(labels[nb])
+            # Shared descendants are expanded under every parent, but a
+            # node already on its own path is not, so cycles terminate.
+            children = succ[nb]
+            if children and nb not in on_path:
+                stack.append((subtree, nb, children))
+
+    add_children(tree, nbrs)
+    while stack:
+        parent, node, nbrs = stack.pop()
+        if parent is None:
+            on_path.remove(node)
+            continue
+        on_path.add(node)
+        stack.append((None, node, None))
+        add_children(parent, nbrs)
     return tree
 
 
 def filter_factory(G, attr, value):
-    def filter(node):
+    """ Return a node filter selecting nodes whose `attr` equals `value`.
+
+    `attr` is looked up as a key of each node's data, falling back to an
+    attribute of it. Matching nodes are collected once, when the filter is
+    made, so make a new filter after changing node data.
+    """
+    matches = set()
+    for node, data in G.nodes(data=True):
         try:
-            if G.nodes[node][attr] == value:
-                return True
-            else:
-                return False
-        except KeyError:
-            try:
-                if getattr(G.nodes[node], attr) == value:
-                    return True
-                else:
-                    return False
-            except AttributeError:
-                return False
-        return False
-    return filter
+            found = data[attr] == value
+        except (KeyError, TypeError):
+            found = getattr(data, attr, _MISS) == value
+        if found:
+            matches.add(node)
+    return frozenset(matches).__contains__
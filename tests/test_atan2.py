@@ -0,0 +1,20 @@
+import numpy as np
+import pytest
+
+pytest.importorskip("numba")
+
+from nxutils._kernels import atan2_approx  # noqa: E402
+
+
+@pytest.mark.parametrize("sx, sy", [(1, 1), (-1, 1), (-1, -1), (1, -1)])
+def test_quadrants(sx, sy):
+    rng = np.random.default_rng(0)
+    for x, y in rng.random((200, 2)) * 10:
+        x, y = sx * x, sy * y
+        assert abs(atan2_approx(y, x) - np.arctan2(y, x)) < 1e-5
+
+
+@pytest.mark.parametrize("y, x", [(0.0, 1.0), (1.0, 0.0), (0.0, -1.0),
+                                  (-1.0, 0.0), (1.0, 1.0), (0.0, 0.0)])
+def test_axes_and_diagonal(y, x):
+    assert atan2_approx(y, x) == pytest.approx(np.arctan2(y, x), abs=1e-5)
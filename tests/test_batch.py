@@ -0,0 +1,28 @@
+import networkx as nx
+import numpy as np
+
+import nxutils as nu
+
+
+def test_one_trace_per_kind():
+    graphs = [nx.path_graph(3, create_using=nx.DiGraph), nx.path_graph(2)]
+    traces = nu.g_to_traces_batch(graphs, layout_func=nx.circular_layout)
+    assert list(traces) == ["nodes", "edges", "arrows"]
+
+    parts = [nu.g_to_plot_arrays(g, nx.circular_layout) for g in graphs]
+    x = np.asarray(traces["nodes"].x)
+    # Nodes of each graph, NaN-separated, no trailing separator.
+    np.testing.assert_array_equal(
+        x, np.concatenate([parts[0].node_xy[:, 0], [np.nan],
+                           parts[1].node_xy[:, 0]]).astype(np.float32))
+    assert len(traces["edges"].x) == 5 + 1 + 2
+    # Only the directed graph has arrows.
+    np.testing.assert_array_equal(np.asarray(traces["arrows"].x),
+                                  parts[0].mid_xy[:, 0])
+
+
+def test_undirected_and_empty():
+    traces = nu.g_to_traces_batch([nx.path_graph(2), nx.path_graph(3)])
+    assert list(traces) == ["nodes", "edges"]
+    traces = nu.g_to_traces_batch([])
+    assert len(traces["nodes"].x) == 0
@@ -0,0 +1,55 @@
+import networkx as nx
+import numpy as np
+
+import nxutils as nu
+from nxutils.nxutils import _downsample
+
+
+def _sep(g, pos):
+    return nu.edges_to_sep_array(g.edges, dict(zip(g, pos)))
+
+
+def test_downsample_no_edges():
+    g = nx.empty_graph(10)
+    pos = np.random.default_rng(0).random((10, 2))
+    cell_xy, counts, edge_sep = _downsample(pos, _sep(g, pos), 4)
+    assert counts.sum() == 10
+    assert len(cell_xy) == len(counts)
+    assert edge_sep.shape == (0, 2)
+
+
+def test_downsample_one_cell():
+    g = nx.complete_graph(5, create_using=nx.DiGraph)
+    pos = np.ones((5, 2))
+    cell_xy, counts, edge_sep = _downsample(pos, _sep(g, pos), 10)
+    np.testing.assert_array_equal(cell_xy, [[1.0, 1.0]])
+    np.testing.assert_array_equal(counts, [5])
+    # Edges inside one cell are dropped.
+    assert edge_sep.shape == (0, 2)
+
+
+def test_downsample_merges_parallel_cell_edges():
+    g = nx.empty_graph(4)
+    g.add_edges_from([(0, 2), (1, 3), (3, 1)])
+    pos = np.array([[0.0, 0.0], [0.01, 0.0], [1.0, 1.0], [0.99, 1.0]])
+    cell_xy, counts, edge_sep = _downsample(pos, _sep(g, pos), 2,
+                                            directed=False)
+    np.testing.assert_array_equal(counts, [2, 2])
+    assert edge_sep.shape == (2, 2)
+
+
+def test_max_points_bins_nodes():
+    g = nx.grid_2d_graph(30, 30)
+    traces = nu.g_to_traces(g, layout_func=nx.spectral_layout,
+                            max_points=100, grid_n=5)
+    assert len(traces["nodes"].x) <= 25
+    assert len(nu.g_to_traces(g, max_points=1000)["nodes"].x) == 900
+
+
+def test_max_points_uses_webgl_unless_disabled():
+    g = nx.grid_2d_graph(10, 10)
+    kwargs = dict(layout_func=nx.spectral_layout, max_points=10, grid_n=3)
+    assert nu.g_to_traces(g, **kwargs)["nodes"].type == "scattergl"
+    traces = nu.g_to_traces(g, use_gl=False, **kwargs)
+    assert traces["nodes"].type == "scatter"
+    assert traces["edges"].type == "scatter"
@@ -0,0 +1,30 @@
+import networkx as nx
+import numpy as np
+
+import nxutils as nu
+
+
+def _layout_3d(g):
+    return nx.random_layout(g, dim=3, seed=0)
+
+
+def test_3d_layouts():
+    g = nx.path_graph(4)
+    pos = _layout_3d(g)
+    expected = np.array([pos[v] for e in g.edges for v in e])
+    np.testing.assert_array_equal(
+        nu.edge_pos_to_array(nu.edge_pos(g.edges, pos)), expected)
+    np.testing.assert_array_equal(
+        nu.edges_to_endpoint_array(g.edges, pos), expected)
+    np.testing.assert_array_equal(
+        nu.g_to_edge_array(g, layout_func=_layout_3d), expected)
+    np.testing.assert_array_equal(
+        nu.edges_to_sep_array(g.edges, pos), nu.separate_edges(expected))
+
+
+def test_no_edges():
+    g = nx.empty_graph(3)
+    pos = nx.circular_layout(g)
+    assert nu.edges_to_endpoint_array(g.edges, pos).shape == (0, 2)
+    assert nu.edges_to_sep_array(g.edges, pos).shape == (0, 2)
+    assert nu.edge_pos_to_array({}).shape == (0, 2)
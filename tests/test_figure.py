@@ -0,0 +1,22 @@
+import networkx as nx
+import plotly.graph_objects as go
+
+import nxutils as nu
+
+
+def test_return_dicts():
+    g = nx.path_graph(3, create_using=nx.DiGraph)
+    traces = nu.g_to_traces(g, return_dicts=True)
+    assert {name: t["type"] for name, t in traces.items()} == {
+        "nodes": "scatter", "edges": "scatter", "arrows": "scattergl"}
+    assert traces["nodes"]["name"] == "nodes"
+    assert traces["arrows"]["marker"]["symbol"] == "arrow-wide"
+
+
+def test_figure_from_graph():
+    g = nx.path_graph(3, create_using=nx.DiGraph)
+    fig = nu.figure_from_graph(g, trace_kwargs={"nodes": {"text": "n"}})
+    assert isinstance(fig, go.Figure)
+    assert [t.name for t in fig.data] == ["nodes", "edges", "arrows"]
+    assert fig.data[0].text == "n"
+    assert isinstance(fig.data[2], go.Scattergl)
@@ -0,0 +1,37 @@
+import networkx as nx
+
+import nxutils as nu
+
+
+def test_filter_factory_matches_key_or_attribute():
+    g = nx.Graph()
+    g.add_node(1, color="red")
+    g.add_node(2, color="blue")
+    g.add_node(3)
+    keep = nu.filter_factory(g, "color", "red")
+    assert [n for n in g if keep(n)] == [1]
+    assert list(nx.subgraph_view(g, filter_node=keep)) == [1]
+
+
+def test_filter_factory_snapshot():
+    g = nx.Graph()
+    g.add_node(1, color="red")
+    keep = nu.filter_factory(g, "color", "red")
+    g.add_node(2, color="red")
+    g.nodes[1]["color"] = "blue"
+    # Matches were collected when the filter was made.
+    assert keep(1) and not keep(2)
+    keep = nu.filter_factory(g, "color", "red")
+    assert keep(2) and not keep(1)
+
+
+def test_filter_factory_attribute_fallback():
+    class Data(dict):
+        pass
+
+    d = Data()
+    d.color = "red"
+    g = nx.Graph()
+    g.add_node(1)
+    g._node[1] = d
+    assert nu.filter_factory(g, "color", "red")(1)
@@ -0,0 +1,117 @@
+import gc
+import weakref
+
+import networkx as nx
+
+import nxutils as nu
+
+
+def test_added_node_is_laid_out():
+    g = nx.path_graph(20)
+    assert len(nu.g_to_plot_arrays(g, nx.spring_layout).node_xy) == 20
+    g.add_node(999)
+    assert len(nu.g_to_plot_arrays(g, nx.spring_layout).node_xy) == 21
+
+
+def test_swapped_node_is_laid_out():
+    g = nx.path_graph(20)
+    nu.g_to_edge_array(g, nx.spring_layout)
+    g.remove_node(19)
+    g.add_edge(0, 1000)
+    assert nu.g_to_edge_array(g, nx.spring_layout).shape == (38, 2)
+
+
+def test_unchanged_graph_reuses_layout():
+    calls = []
+
+    def layout(g):
+        calls.append(g)
+        return nx.circular_layout(g)
+
+    g = nx.cycle_graph(5)
+    nu.g_to_plot_arrays(g, layout)
+    nu.g_to_plot_arrays(g, layout)
+    assert len(calls) == 1
+    g.graph["_layout_version"] = 1
+    nu.g_to_plot_arrays(g, layout)
+    assert len(calls) == 2
+    nu.invalidate_layout(g)
+    nu.g_to_plot_arrays(g, layout)
+    assert len(calls) == 3
+
+
+class _Pos(dict):
+    """ A layout result that can be weakly referenced."""
+
+
+def test_one_layout_kept_per_graph():
+    results = []
+    calls = []
+
+    def make_layout():
+        def layout(g):
+            calls.append(layout)
+            pos = _Pos(nx.circular_layout(g))
+            results.append(weakref.ref(pos))
+            return pos
+        return layout
+
+    g = nx.cycle_graph(5)
+    # Keep every layout_func alive, so only the cache can drop results.
+    layouts = [make_layout() for _ in range(5)]
+    for layout in layouts:
+        nu.g_to_plot_arrays(g, layout)
+    gc.collect()
+    assert [r() is not None for r in results] == [False] * 4 + [True]
+    nu.g_to_plot_arrays(g, layouts[-1])
+    assert len(calls) == 5
+    nu.g_to_plot_arrays(g, layouts[0])
+    assert len(calls) == 6
+
+
+class _SelfLaidOut(nx.DiGraph):
+    def layout_func(self, g):
+        return nx.circular_layout(g)
+
+
+def test_graph_is_freed():
+    g = _SelfLaidOut([(0, 1), (1, 2)])
+    nu.g_to_traces(g)
+    h = nx.path_graph(3)
+    nu.g_to_plot_arrays(h, lambda g: nx.circular_layout(h))
+    refs = [weakref.ref(g), weakref.ref(h)]
+    del g, h
+    gc.collect()
+    assert [r() for r in refs] == [None, None]
+
+
+def test_graph_method_layout_is_reused():
+    calls = []
+
+    class Counting(nx.Graph):
+        def layout_func(self, g):
+            calls.append(g)
+            return nx.circular_layout(g)
+
+    g = Counting([(0, 1)])
+    nu.g_to_plot_arrays(g)
+    nu.g_to_plot_arrays(g)
+    assert len(calls) == 1
+
+
+def test_planarity_is_memoized(monkeypatch):
+    calls = []
+    is_planar = nx.is_planar
+
+    def counting(g):
+        calls.append(g)
+        return is_planar(g)
+
+    monkeypatch.setattr(nx, "is_planar", counting)
+    g = nx.complete_graph(5)
+    nu.g_to_plot_arrays(g)
+    nu.g_to_plot_arrays(g)
+    assert len(calls) == 1
+    g.remove_edge(0, 1)
+    nu.g_to_plot_arrays(g)
+    assert len(calls) == 2
@@ -0,0 +1,42 @@
+import numpy as np
+import pytest
+
+import nxutils as nu
+from nxutils import nxutils
+
+
+def _edge_sep(n_edges, dtype=np.float32):
+    e = np.random.default_rng(1).random((3 * n_edges - 1, 2)).astype(dtype)
+    e[2::3] = np.nan
+    return e
+
+
+def test_mid_data_numpy():
+    e = _edge_sep(4, np.float64)
+    mid_pos, mid_angle = nu.edge_sep_to_mid_data(None, e)
+    np.testing.assert_allclose(mid_pos, (e[0::3] + e[1::3]) / 2)
+    d = e[1::3] - e[0::3]
+    np.testing.assert_allclose(mid_angle,
+                               np.degrees(np.arctan2(d[:, 0], d[:, 1])))
+
+
+def test_numba_is_opt_in(monkeypatch):
+    def kernel(*args):
+        raise AssertionError("kernel used without NXUTILS_NUMBA")
+
+    monkeypatch.setattr(nxutils, "_mid_kernel", lambda: kernel)
+    monkeypatch.setattr(nxutils, "_USE_NUMBA", False)
+    monkeypatch.setattr(nxutils, "_NUMBA_MIN_EDGES", 1)
+    nu.edge_sep_to_mid_data(None, _edge_sep(4))
+
+
+def test_mid_kernel_matches_numpy(monkeypatch):
+    pytest.importorskip("numba")
+    e = _edge_sep(10)
+    expected_pos, expected_angle = nu.edge_sep_to_mid_data(None, e)
+    monkeypatch.setattr(nxutils, "_USE_NUMBA", True)
+    monkeypatch.setattr(nxutils, "_NUMBA_MIN_EDGES", 1)
+    mid_pos, mid_angle = nu.edge_sep_to_mid_data(None, e)
+    assert mid_pos.dtype == mid_angle.dtype == np.float32
+    np.testing.assert_allclose(mid_pos, expected_pos, rtol=1e-6)
+    np.testing.assert_allclose(mid_angle, expected_angle, atol=1e-3)
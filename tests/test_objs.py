@@ -0,0 +1,84 @@
+from types import SimpleNamespace
+
+import networkx as nx
+import pytest
+
+import nxutils as nu
+
+
+class _CountingObj:
+    """ Counts reads of each attribute."""
+
+    def __init__(self, **attrs):
+        self.reads = {}
+        self.attrs = attrs
+
+    def __getattr__(self, name):
+        if name in ("reads", "attrs"):
+            raise AttributeError(name)
+        self.reads[name] = self.reads.get(name, 0) + 1
+        try:
+            return self.attrs[name]
+        except KeyError:
+            raise AttributeError(name) from None
+
+
+def test_none_parent_adds_no_edge():
+    obj = SimpleNamespace(id=1, parent_id=2, project_id=None, section_id=3)
+    node, edges = nu.obj_to_node_and_edges(obj, "id")
+    assert node == (1, {"obj": obj})
+    assert edges == [(1, 2), (1, 3)]
+
+
+def test_parent_read_once():
+    obj = _CountingObj(id=1, parent_id=2, label="x")
+    _, edges = nu.obj_to_node_and_edges(obj, "id", edge_attr=["label"])
+    assert edges == [(1, 2, {"label": "x"})]
+    assert obj.reads["parent_id"] == 1
+    assert obj.reads["label"] == 1
+
+
+def test_edge_data_layering():
+    obj = SimpleNamespace(id=1, parent_id=2, kind="a", weight=None)
+    _, edges = nu.obj_to_node_and_edges(
+        obj, "id", parent_attr_list=["parent_id"],
+        edge_attr={"type": "kind", "w": "weight"},
+        edge_attr_func=lambda o: {"type": "b", "extra": 1})
+    assert edges == [(1, 2, {"type": "b", "extra": 1})]
+    _, edges = nu.obj_to_node_and_edges(
+        obj, "id", parent_attr_list=["parent_id"], edge_attr=False,
+        edge_attr_func=lambda o: {"extra": 1})
+    assert edges == [(1, 2)]
+
+
+def test_batch_matches_single():
+    objs = [SimpleNamespace(id=i, parent_id=i - 1 if i else None,
+                            project_id=None, kind=str(i))
+            for i in range(5)]
+    nodes, edges = nu.obj_list_to_node_and_edges(objs, "id",
+                                                 edge_attr=["kind"])
+    single = [nu.obj_to_node_and_edges(o, "id", edge_attr=["kind"])
+              for o in objs]
+    assert nodes == [n for n, _ in single]
+    assert edges == [e for _, es in single for e in es]
+    g = nu.objs_to_graph(objs, "id")
+    assert sorted(g.edges) == [(1, 0), (2, 1), (3, 2), (4, 3)]
+
+
+def test_node_attr_is_plain_attribute():
+    obj = SimpleNamespace(a=SimpleNamespace(b=1))
+    with pytest.raises(AttributeError):
+        nu.obj_to_node_and_edges(obj, "a.b")
+    with pytest.raises(AttributeError):
+        nu.obj_list_to_node_and_edges([obj], "a.b")
+
+
+def test_objs_to_graph_into_existing_graph():
+    g = nx.DiGraph()
+    g.add_edge("root", "other")
+    objs = [SimpleNamespace(id=1, parent_id="root"),
+            SimpleNamespace(id=2, parent_id=1)]
+    out = nu.objs_to_graph(objs, "id", parent_attr_list=["parent_id"], g=g)
+    assert out is g
+    assert set(g.edges) == {("root", "other"), (1, "root"), (2, 1)}
+    assert g.nodes[2]["obj"] is objs[1]
@@ -0,0 +1,27 @@
+import networkx as nx
+
+import nxutils as nu
+
+
+def test_plot_arrays_acts_like_tuple():
+    arrays = nu.g_to_plot_arrays(nx.path_graph(4, create_using=nx.DiGraph))
+    pos, edge_sep, mid_data = arrays
+    assert len(arrays) == 3
+    assert arrays[0] is pos
+    assert arrays[1] is edge_sep
+    assert arrays[-1][0] is arrays.mid_xy
+    assert arrays[:2] == (pos, edge_sep)
+
+
+def test_plot_arrays_undirected_has_no_mid_data():
+    arrays = nu.g_to_plot_arrays(nx.path_graph(4))
+    assert arrays[2] is None
+    assert arrays.node_xy.shape == (4, 2)
+    assert arrays.edge_xy.shape == (8, 2)
+
+
+def test_plot_arrays_compare_by_identity():
+    g = nx.path_graph(4)
+    arrays = nu.g_to_plot_arrays(g)
+    assert arrays == arrays
+    assert arrays != nu.g_to_plot_arrays(g)
@@ -0,0 +1,29 @@
+import networkx as nx
+
+import nxutils as nu
+
+
+def _labels(tree):
+    return [(str(t.label), _labels(t)) for t in tree.children]
+
+
+def test_shared_descendant_under_each_parent():
+    g = nx.DiGraph([("a", "b"), ("a", "c"), ("b", "d"), ("c", "d")])
+    assert _labels(nu.diGraph_to_richTree(g)) == [
+        ("a", [("b", [("d", [])]), ("c", [("d", [])])])]
+
+
+def test_cycle_stops_at_node_on_path():
+    g = nx.DiGraph([(0, 1), (1, 2), (2, 1), (1, 3)])
+    tree = nu.diGraph_to_richTree(g, n=0)
+    assert _labels(tree) == [("1", [("2", [("1", [])]), ("3", [])])]
+
+
+def test_deep_path():
+    g = nx.path_graph(5000, create_using=nx.DiGraph)
+    tree = nu.diGraph_to_richTree(g)
+    depth = 0
+    while tree.children:
+        (tree,) = tree.children
+        depth += 1
+    assert depth == 5000
@@ -0,0 +1,35 @@
+import pytest
+
+from nxutils import nxutils
+from nxutils.nxutils import _merge_trace_kwargs
+
+
+def test_layers_over_defaults():
+    kw = _merge_trace_kwargs({"nodes": {"text": ["a"]},
+                              "edges": {"mode": "lines+markers"}},
+                             directed=True)
+    assert kw["nodes"] == {"name": "nodes", "mode": "markers", "text": ["a"]}
+    assert kw["edges"] == {"name": "edges", "mode": "lines+markers"}
+    assert kw["arrows"]["marker"]["symbol"] == "arrow-wide"
+    # Defaults are copied, never modified.
+    assert nxutils._TRACE_DEFAULTS["nodes"] == {"name": "nodes",
+                                                "mode": "markers"}
+
+
+def test_marker_keeps_defaults():
+    kw = _merge_trace_kwargs({"arrows": {"marker": {"color": "red"}}},
+                             directed=True)
+    assert kw["arrows"]["marker"] == {"size": 12, "symbol": "arrow-wide",
+                                      "color": "red"}
+    assert nxutils._TRACE_DEFAULTS["arrows"]["marker"]["color"] == "green"
+
+
+def test_none_leaves_trace_out():
+    assert set(_merge_trace_kwargs({"arrows": None}, True)) == {"nodes",
+                                                                "edges"}
+    assert set(_merge_trace_kwargs({"edges": None}, False)) == {"nodes"}
+
+
+def test_arrows_need_directed_graph():
+    with pytest.raises(TypeError):
+        _merge_trace_kwargs({"arrows": {}}, directed=False)
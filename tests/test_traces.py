@@ -0,0 +1,26 @@
+import networkx as nx
+
+import nxutils as nu
+from nxutils import nxutils
+
+
+def _no_mid_data(*args):
+    raise AssertionError("midpoints computed without an arrows trace")
+
+
+def test_include_mid_false_skips_mid_data(monkeypatch):
+    g = nx.path_graph(4, create_using=nx.DiGraph)
+    assert nu.g_to_plot_arrays(g).mid_xy is not None
+    monkeypatch.setattr(nxutils, "edge_sep_to_mid_data", _no_mid_data)
+    arrays = nu.g_to_plot_arrays(g, include_mid=False)
+    assert arrays.mid_xy is None and arrays.mid_angle is None
+
+
+def test_no_arrows_trace_skips_mid_data(monkeypatch):
+    g = nx.path_graph(3, create_using=nx.DiGraph)
+    assert list(nu.g_to_traces(g)) == ["nodes", "edges", "arrows"]
+    monkeypatch.setattr(nxutils, "edge_sep_to_mid_data", _no_mid_data)
+    traces = nu.g_to_traces(g, trace_kwargs={"arrows": None})
+    assert list(traces) == ["nodes", "edges"]
+    traces = nu.g_to_traces(g, trace_kwargs={"arrows": None}, max_points=1)
+    assert list(traces) == ["nodes", "edges"]
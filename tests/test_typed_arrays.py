@@ -0,0 +1,32 @@
+import base64
+import json
+
+import networkx as nx
+import numpy as np
+
+import nxutils as nu
+
+
+def _decode(spec):
+    assert spec["dtype"] == "f4"
+    return np.frombuffer(base64.b64decode(spec["bdata"]), dtype=np.float32)
+
+
+def test_dict_traces_use_typed_arrays():
+    g = nx.path_graph(4, create_using=nx.DiGraph)
+    pos, edge_sep, (mid_xy, _) = nu.g_to_plot_arrays(g)
+    traces = nu.g_to_traces(g, return_dicts=True)
+    np.testing.assert_array_equal(_decode(traces["nodes"]["x"]), pos[:, 0])
+    np.testing.assert_array_equal(_decode(traces["edges"]["y"]),
+                                  edge_sep[:, 1])
+    np.testing.assert_array_equal(_decode(traces["arrows"]["x"]),
+                                  mid_xy[:, 0])
+
+
+def test_figure_json_is_binary():
+    g = nx.path_graph(4)
+    fig = json.loads(nu.figure_from_graph(g).to_json())
+    x = fig["data"][0]["x"]
+    assert x["dtype"] == "f4"
+    np.testing.assert_array_equal(_decode(x),
+                                  nu.g_to_plot_arrays(g).node_xy[:, 0])
@@ -0,0 +1,30 @@
+import networkx as nx
+
+import nxutils as nu
+from nxutils import nxutils
+
+
+def _types(traces):
+    return {name: t.type for name, t in traces.items()}
+
+
+def test_webgl_above_threshold(monkeypatch):
+    monkeypatch.setattr(nxutils, "_GL_THRESHOLD", 10)
+    small = nx.path_graph(4)
+    large = nx.path_graph(11)
+    assert _types(nu.g_to_traces(small)) == {"nodes": "scatter",
+                                             "edges": "scatter"}
+    assert _types(nu.g_to_traces(large)) == {"nodes": "scattergl",
+                                             "edges": "scattergl"}
+    # Edge rows count too: 4 edges take 11 rows.
+    edges_only = nx.star_graph(4)
+    assert _types(nu.g_to_traces(edges_only))["edges"] == "scattergl"
+
+
+def test_explicit_use_gl(monkeypatch):
+    monkeypatch.setattr(nxutils, "_GL_THRESHOLD", 10)
+    large = nx.path_graph(11, create_using=nx.DiGraph)
+    assert _types(nu.g_to_traces(large, use_gl=False)) == {
+        "nodes": "scatter", "edges": "scatter", "arrows": "scattergl"}
+    small = nx.path_graph(2)
+    assert _types(nu.g_to_traces(small, use_gl=True))["nodes"] == "scattergl"